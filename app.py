@@ -1,17 +1,27 @@
 from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
+import re
+import sys
 import json
 import bcrypt
-import pandas as pd
-from docx import Document
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from docx.shared import Inches
-from docx.enum.section import WD_ORIENT
-from docx.enum.table import WD_TABLE_ALIGNMENT
 import mimetypes
 import logging
+import threading
+import time
+import queue
+import atexit
+import gzip
+import hashlib
+import tempfile
+import itertools
+import contextlib
+import weakref
+from collections import OrderedDict, deque
 from pathlib import Path
 
 # Configure logging
@@ -20,55 +30,116 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# CORS configuration
-CORS(app, resources={
-    r"/*": {
-        "origins": [
-            "http://127.0.0.1:5500", 
-            "http://localhost:5500",
-            "http://localhost:3000",
-            "https://*.onrender.com",
-            "https://*.vercel.app"
-        ]
-    }
-})
+# Proxies in front of the app whose X-Forwarded-For is trusted. Render adds one;
+# behind any other proxy set TRUSTED_PROXY_HOPS, or every client shares the
+# proxy's address and with it one login failure limit
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "1" if os.environ.get("RENDER") else "0"))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# CORS configuration; one precompiled pattern, since flask-cors would read
+# "https://*.onrender.com" as a regex that never matches a real subdomain
+CORS_ORIGINS = re.compile(
+    r"^(http://(127\.0\.0\.1|localhost):5500"
+    r"|http://localhost:3000"
+    r"|https://[\w-]+\.(onrender\.com|vercel\.app))$"
+)
+CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}})
+
+# Compress responses when flask-compress is available
+try:
+    from flask_compress import Compress
+    # Private, but reusing it keeps cached bodies negotiated exactly like flask-compress
+    from flask_compress.flask_compress import _choose_algorithm
+    # Brotli packs JSON tighter than gzip; gzip remains for older clients
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'deflate']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config['COMPRESS_LEVEL'] = 6
+    compress = Compress(app)
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    logger.warning("flask-compress not available. Responses will not be compressed.")
+    COMPRESS_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 # Configure MIME types for videos
-mimetypes.add_type('video/mp4', '.mp4')
-mimetypes.add_type('video/webm', '.webm')
-mimetypes.add_type('video/ogg', '.ogv')
-mimetypes.add_type('video/avi', '.avi')
-mimetypes.add_type('video/mov', '.mov')
-mimetypes.add_type('video/wmv', '.wmv')
+VIDEO_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+    '.ogv': 'video/ogg',
+    '.avi': 'video/avi',
+    '.mov': 'video/mov',
+    '.wmv': 'video/wmv',
+}
+for ext, mime_type in VIDEO_MIME_TYPES.items():
+    mimetypes.add_type(mime_type, ext)
 
 # Try to import PostgreSQL, fallback to JSON files if not available
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
-    import psycopg2.pool
+    from psycopg2.extras import RealDictCursor, execute_values
+    from psycopg2.pool import ThreadedConnectionPool
     POSTGRES_AVAILABLE = True
     logger.info("PostgreSQL support available")
 except ImportError as e:
     logger.warning(f"PostgreSQL not available: {e}. Using JSON files as fallback.")
     POSTGRES_AVAILABLE = False
 
-# Database configuration
+# Try to import orjson for faster JSON responses, fallback to Flask's jsonify
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.warning("orjson not available. Using stdlib json.")
+    ORJSON_AVAILABLE = False
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, keeping Flask's encoding of dates and decimals"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode("utf-8")
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+
+# Try to import fcntl to lock JSON files across workers, fallback to a process lock
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    logger.warning("fcntl not available. JSON writes are only serialized within each process.")
+    FCNTL_AVAILABLE = False
+
+# Database configuration; the pool is created lazily so each gunicorn
+# worker opens its own connections after fork
 DATABASE_URL = os.environ.get('DATABASE_URL')
-if DATABASE_URL and POSTGRES_AVAILABLE:
-    try:
-        db_pool = psycopg2.pool.SimpleConnectionPool(
-            1, 20,
-            DATABASE_URL,
-            cursor_factory=RealDictCursor
-        )
-        logger.info("Database connection pool created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database pool: {e}")
-        db_pool = None
-        POSTGRES_AVAILABLE = False
-else:
-    db_pool = None
-    POSTGRES_AVAILABLE = False
+POSTGRES_AVAILABLE = POSTGRES_AVAILABLE and bool(DATABASE_URL)
+db_pool = None
+_db_pool_lock = threading.Lock()
+
+# Hot statements, prepared once per pooled connection on first use
+PREPARED_STATEMENTS = {
+    "login_user": """
+        PREPARE login_user(text) AS
+        SELECT senha, tipo FROM users WHERE usuario = $1
+    """,
+    "insert_user": """
+        PREPARE insert_user(text, text, text) AS
+        INSERT INTO users (usuario, senha, tipo) VALUES ($1, $2, $3)
+        ON CONFLICT (usuario) DO NOTHING
+        RETURNING id
+    """,
+}
+_prepared_statements = weakref.WeakKeyDictionary()
 
 # Path definitions
 BASE_DIR = Path(__file__).parent.absolute()
@@ -87,54 +158,371 @@ DOCUMENTS_FILE = DATA_DIR / "dados.json"
 LOGS_FILE = DATA_DIR / "logs.json"
 EXPORTS_FILE = DATA_DIR / "exportacoes.json"
 
+# Mode for new data files, as open() would create them; read once while single-threaded
+_umask = os.umask(0)
+os.umask(_umask)
+DATA_FILE_MODE = 0o666 & ~_umask
+
+# Append-only journal for log entries, compacted into LOGS_FILE periodically
+LOGS_JOURNAL_FILE = DATA_DIR / "logs.jsonl"
+LOGS_COMPACT_EVERY = 100
+LOGS_FLUSH_INTERVAL = 0.5
+LOG_QUEUE_SIZE = 10000
+MAX_LOGS = 1000
+
+# In-memory copies of the JSON files, keyed by path with their (mtime_ns, size)
+_json_cache = {}
+_json_indexes = {}
+_response_cache = {}
+_logs_lock = threading.Lock()
+# Journal line count, valid while the journal is still _logs_journal_bytes long;
+# other workers append too, so a different length means recounting
+_logs_journal_size = 0
+_logs_journal_bytes = None
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_writer_lock = threading.Lock()
+_log_writer_thread = None
+_log_ids = itertools.count()
+_file_locks_held = threading.local()
+_file_lock_fallbacks = {}
+
 # Allowed extensions
-ALLOWED_EXTENSIONS = {
+ALLOWED_EXTENSIONS = frozenset({
     "png", "jpg", "jpeg", "gif", "bmp",
     "mp4", "avi", "mov", "wmv",
     "mp3", "wav", "ogg", "m4a",
     "pdf", "doc", "docx", "txt"
-}
+})
+ALLOWED_SUFFIXES = tuple("." + ext for ext in ALLOWED_EXTENSIONS)
+
+# bcrypt work factor for new password hashes
+BCRYPT_COST = int(os.environ.get("BCRYPT_COST", "12"))
+BCRYPT_PREFIX = b"2b"
+
+# Default admin password hash, precomputed for admin123 so boot skips bcrypt;
+# set ADMIN_BCRYPT_HASH to seed a different password
+ADMIN_BCRYPT_HASH = os.environ.get("ADMIN_BCRYPT_HASH") or "$2b$12$/szCs8QzOJSXhRH1Abp0PefVE3w02MWLvw97u0cvdXvdGXOZbWNk."
+ADMIN_LOGIN_HINT = "admin" if os.environ.get("ADMIN_BCRYPT_HASH") else "admin/admin123"
+
+# Hash checked when the user does not exist, keeping login timing uniform; precomputed
+# at cost 12 like the stored hashes, so set DUMMY_BCRYPT_HASH when changing BCRYPT_COST
+DUMMY_BCRYPT_HASH = (os.environ.get("DUMMY_BCRYPT_HASH") or "$2b$12$w5zmHkiVvFvA1xkNalb6DedP1x8Q5O6rj.FhUAvz7K7.7w6ky2e2S").encode("utf-8")
+
+# Successful password checks remembered to skip bcrypt on repeated logins
+PASSWORD_CACHE_SIZE = 1024
+PASSWORD_CACHE_TTL = int(os.environ.get("PASSWORD_CACHE_TTL", "300"))
+_password_checks = OrderedDict()
+_password_checks_lock = threading.Lock()
+
+# Failed logins per client IP; past the limit /login answers 429 without bcrypt or logging
+LOGIN_MAX_FAILURES = int(os.environ.get("LOGIN_MAX_FAILURES", "10"))
+LOGIN_FAILURE_WINDOW = 60
+LOGIN_TRACKED_IPS = 10000
+_failed_logins = OrderedDict()
+_failed_logins_lock = threading.Lock()
+_proxy_warning_logged = False
+
+# Seconds a cached PostgreSQL listing may be served before querying again
+RESPONSE_CACHE_TTL = 5
+
+# Rows fetched per round-trip when streaming query results
+STREAM_BATCH_SIZE = 500
 
 # Maximum file size (16MB)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
+def file_signature(filepath):
+    """Return (inode, mtime_ns, size) for filepath, or None if it does not exist"""
+    try:
+        st = filepath.stat()
+    except FileNotFoundError:
+        return None
+    # Writes replace the file, so the inode changes even within one mtime tick
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+@contextlib.contextmanager
+def json_file_lock(filepath):
+    """Hold an exclusive lock on filepath across threads and workers; reentrant per thread"""
+    held = _file_locks_held.__dict__.setdefault("paths", set())
+    if filepath in held:
+        yield
+        return
+    
+    held.add(filepath)
+    try:
+        if not FCNTL_AVAILABLE:
+            lock = _file_lock_fallbacks.get(filepath)
+            if lock is None:
+                lock = _file_lock_fallbacks.setdefault(filepath, threading.Lock())
+            with lock:
+                yield
+            return
+        
+        fd = os.open(filepath.parent / f".{filepath.name}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+    finally:
+        held.discard(filepath)
+
+def invalidate_json_caches(filepath):
+    """Drop indexes and encoded responses derived from filepath"""
+    _response_cache.pop(filepath, None)
+    for cache_key in [k for k in _json_indexes if k[0] == filepath]:
+        _json_indexes.pop(cache_key, None)
+
 def load_json_file(filepath, default=None):
-    """Safely load JSON file with error handling"""
+    """Load JSON file through the in-memory cache, reparsing only when it changed on disk"""
+    signature = file_signature(filepath)
+    cached = _json_cache.get(filepath)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
     if default is None:
         default = []
     
+    invalidate_json_caches(filepath)
+    if signature is None:
+        _json_cache[filepath] = (signature, default)
+        return default
+    
     try:
-        if filepath.exists():
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        content = filepath.read_bytes()
+        data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        _json_cache[filepath] = (signature, data)
+        return data
+    except (ValueError, IOError) as e:
         logger.error(f"Error loading {filepath}: {e}")
-    
-    return default
+        return default
 
 def save_json_file(filepath, data):
     """Safely save JSON file with error handling"""
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            content = orjson.dumps(data)
+        else:
+            content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        
+        # Write a temp file and swap it in, so readers never see a partial file
+        with json_file_lock(filepath):
+            with tempfile.NamedTemporaryFile(dir=filepath.parent, prefix=f".{filepath.name}.", delete=False) as f:
+                try:
+                    # Temp files are created 0600; keep the mode the data file had
+                    try:
+                        mode = filepath.stat().st_mode & 0o7777
+                    except FileNotFoundError:
+                        mode = DATA_FILE_MODE
+                    os.chmod(f.name, mode)
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    os.unlink(f.name)
+                    raise
+            os.replace(f.name, filepath)
+            _json_cache[filepath] = (file_signature(filepath), data)
+        invalidate_json_caches(filepath)
         return True
-    except IOError as e:
+    except (TypeError, IOError) as e:
         logger.error(f"Error saving {filepath}: {e}")
         return False
 
+def load_json_index(filepath, key):
+    """Load JSON file as a dict indexed by the given field"""
+    data = load_json_file(filepath, [])
+    cache_key = (filepath, key)
+    if cache_key not in _json_indexes:
+        _json_indexes[cache_key] = {item.get(key): item for item in data}
+    return _json_indexes[cache_key]
+
+def logs_signature():
+    """Signature of the logs snapshot and journal together"""
+    return (file_signature(LOGS_FILE), file_signature(LOGS_JOURNAL_FILE))
+
+def read_logs_from_disk():
+    """Read logs snapshot and replay entries from the journal (caller holds _logs_lock)"""
+    logs = list(load_json_file(LOGS_FILE, []))
+    try:
+        if LOGS_JOURNAL_FILE.exists():
+            seen = {log.get("id") for log in logs}
+            with open(LOGS_JOURNAL_FILE, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                    if entry.get("id") not in seen:
+                        logs.append(entry)
+    except (ValueError, IOError) as e:
+        logger.error(f"Error replaying {LOGS_JOURNAL_FILE}: {e}")
+    
+    del logs[:-MAX_LOGS]
+    return logs
+
+def load_logs_json():
+    """Load logs through the in-memory cache, rereading when another process wrote them"""
+    cached = _json_cache.get(LOGS_JOURNAL_FILE)
+    if cached is not None and cached[0] == logs_signature():
+        return cached[1]
+    
+    with _logs_lock:
+        signature = logs_signature()
+        cached = _json_cache.get(LOGS_JOURNAL_FILE)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        logs = read_logs_from_disk()
+        _json_cache[LOGS_JOURNAL_FILE] = (signature, logs)
+        _response_cache.pop(LOGS_FILE, None)
+        return logs
+
+def compact_logs_json():
+    """Write logs snapshot and truncate the journal (caller holds _logs_lock and the LOGS_FILE lock)"""
+    global _logs_journal_size, _logs_journal_bytes
+    
+    if save_json_file(LOGS_FILE, read_logs_from_disk()):
+        try:
+            LOGS_JOURNAL_FILE.write_bytes(b"")
+            _logs_journal_size = 0
+            _logs_journal_bytes = 0
+        except IOError as e:
+            logger.error(f"Error truncating {LOGS_JOURNAL_FILE}: {e}")
+    
+    _json_cache.pop(LOGS_JOURNAL_FILE, None)
+    _response_cache.pop(LOGS_FILE, None)
+
+def encode_json(data):
+    """Encode data as JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=app.json.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return app.json.dumps(data).encode("utf-8")
+
+def choose_encoding(size):
+    """Pick the encoding flask-compress would use for a body of this size, or None"""
+    if not COMPRESS_AVAILABLE or size < app.config['COMPRESS_MIN_SIZE']:
+        return None
+    encoding = _choose_algorithm(compress.enabled_algorithms, request.headers.get("Accept-Encoding", ""))
+    if encoding == "gzip" or (encoding == "br" and BROTLI_AVAILABLE):
+        return encoding
+    return None
+
+def compress_body(body, encoding):
+    """Compress body with the same settings flask-compress uses"""
+    if encoding == "br":
+        return brotli.compress(body, quality=app.config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(body, compresslevel=app.config['COMPRESS_LEVEL'], mtime=0)
+
+def make_json_response(body, etag, compressed):
+    """Wrap encoded JSON in a response that answers If-None-Match with 304"""
+    response = app.response_class(body, mimetype="application/json")
+    # compressed holds this body per encoding, so each encoding is compressed once
+    encoding = choose_encoding(len(body))
+    if encoding:
+        if encoding not in compressed:
+            compressed[encoding] = compress_body(body, encoding)
+        # flask-compress leaves responses that already carry Content-Encoding alone
+        response.set_data(compressed[encoding])
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        etag = f"{etag}:{encoding}"
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def store_json_response(key, load, ttl=None):
+    """Encode load() and keep the body under key, unless key was invalidated meanwhile"""
+    # The token is set before loading, so a write at any later point drops this body
+    token = _response_cache[key] = object()
+    body = encode_json(load())
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    compressed = {}
+    if _response_cache.get(key) is token:
+        expires = time.monotonic() + ttl if ttl else float("inf")
+        _response_cache[key] = (body, etag, expires, compressed)
+    return make_json_response(body, etag, compressed)
+
+def get_cached_response(key):
+    """Return a still-valid cached response for key, or None"""
+    cached = _response_cache.get(key)
+    if isinstance(cached, tuple) and cached[2] > time.monotonic():
+        body, etag, _, compressed = cached
+        return make_json_response(body, etag, compressed)
+    return None
+
+def cached_json_response(filepath, load, project=None):
+    """Serve a JSON listing, reusing the encoded body until filepath changes"""
+    # Loading first revalidates the file and drops stale bodies
+    load()
+    return get_cached_response(filepath) or store_json_response(
+        filepath, (lambda: project(load())) if project else load)
+
+def ttl_json_response(key, query):
+    """Serve a PostgreSQL listing from a short-lived cache, since other workers may write too"""
+    return get_cached_response(key) or store_json_response(key, query, RESPONSE_CACHE_TTL)
+
+def init_db_pool():
+    """Create the connection pool in the current process, falling back to JSON on failure"""
+    global db_pool, POSTGRES_AVAILABLE
+    
+    with _db_pool_lock:
+        if db_pool is not None or not POSTGRES_AVAILABLE:
+            return db_pool
+        
+        try:
+            # Thread-safe pool, required by gthread/gevent workers
+            db_pool = ThreadedConnectionPool(
+                int(os.environ.get('DB_POOL_MIN', 5)),
+                int(os.environ.get('DB_POOL_MAX', 20)),
+                DATABASE_URL,
+                cursor_factory=RealDictCursor
+            )
+            logger.info("Database connection pool created successfully")
+        except Exception as e:
+            logger.error(f"Error creating database pool: {e}")
+            POSTGRES_AVAILABLE = False
+        return db_pool
+
 def get_db_connection():
     """Get database connection from pool"""
-    if POSTGRES_AVAILABLE and db_pool:
+    if POSTGRES_AVAILABLE and (db_pool or init_db_pool()):
         return db_pool.getconn()
     return None
 
 def return_db_connection(conn):
-    """Return connection to pool"""
+    """Return connection to pool, discarding it if it was closed"""
     if POSTGRES_AVAILABLE and db_pool and conn:
-        db_pool.putconn(conn)
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+def execute_prepared(cur, name, params):
+    """Run a statement from PREPARED_STATEMENTS, preparing it on this connection if needed"""
+    prepared = _prepared_statements.setdefault(cur.connection, set())
+    if name not in prepared:
+        cur.execute(PREPARED_STATEMENTS[name])
+        prepared.add(name)
+    cur.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params)
+
+@contextlib.contextmanager
+def db_cursor():
+    """Yield a pooled cursor; commit on success, roll back on error, always return the connection"""
+    conn = get_db_connection()
+    if not conn:
+        raise psycopg2.OperationalError("No database connection available")
+    
+    cur = conn.cursor()
+    try:
+        yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        return_db_connection(conn)
 
 def init_database():
     """Initialize database tables or JSON files"""
+    # Creating the pool first lets a failed connection fall back to JSON files
+    init_db_pool()
     if POSTGRES_AVAILABLE:
         return init_postgres_database()
     else:
@@ -142,101 +530,83 @@ def init_database():
 
 def init_postgres_database():
     """Initialize PostgreSQL database tables"""
-    conn = get_db_connection()
-    if not conn:
-        logger.error("No database connection available")
-        return False
-    
     try:
-        cur = conn.cursor()
-        
-        # Create users table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                usuario VARCHAR(100) UNIQUE NOT NULL,
-                senha VARCHAR(255) NOT NULL,
-                tipo VARCHAR(50) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create documents table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS documents (
-                id VARCHAR(50) PRIMARY KEY,
-                data JSONB NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create logs table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS logs (
-                id VARCHAR(50) PRIMARY KEY,
-                usuario VARCHAR(100),
-                acao VARCHAR(100),
-                detalhes TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create exports table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS exports (
-                id VARCHAR(50) PRIMARY KEY,
-                nome_arquivo VARCHAR(255),
-                tipo VARCHAR(50),
-                usuario VARCHAR(100),
-                quantidade_documentos INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        conn.commit()
-        logger.info("PostgreSQL database tables initialized successfully")
-        
-        # Create default admin user if not exists
-        cur.execute("SELECT COUNT(*) FROM users WHERE usuario = %s", ('admin',))
-        if cur.fetchone()['count'] == 0:
-            admin_password = bcrypt.hashpw("admin123".encode("utf-8"), bcrypt.gensalt())
+        with db_cursor() as cur:
+            # Create all tables and indexes in a single round-trip
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id SERIAL PRIMARY KEY,
+                    usuario VARCHAR(100) UNIQUE NOT NULL,
+                    senha VARCHAR(255) NOT NULL,
+                    tipo VARCHAR(50) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                CREATE TABLE IF NOT EXISTS documents (
+                    id VARCHAR(50) PRIMARY KEY,
+                    data JSONB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                CREATE TABLE IF NOT EXISTS logs (
+                    id VARCHAR(50) PRIMARY KEY,
+                    usuario VARCHAR(100),
+                    acao VARCHAR(100),
+                    detalhes TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                
+                -- /ver_logs reads the newest entries first
+                CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp DESC);
+                
+                CREATE TABLE IF NOT EXISTS exports (
+                    id VARCHAR(50) PRIMARY KEY,
+                    nome_arquivo VARCHAR(255),
+                    tipo VARCHAR(50),
+                    usuario VARCHAR(100),
+                    quantidade_documentos INTEGER,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            
+            # Create default admin user if not exists; idempotent when workers boot together
             cur.execute("""
                 INSERT INTO users (usuario, senha, tipo) 
                 VALUES (%s, %s, %s)
-            """, ('admin', admin_password.decode("utf-8"), 'administrador'))
-            conn.commit()
-            logger.info("Default admin user created: admin/admin123")
+                ON CONFLICT (usuario) DO NOTHING
+                RETURNING id
+            """, ('admin', ADMIN_BCRYPT_HASH, 'administrador'))
+            admin_created = cur.fetchone() is not None
         
+        logger.info("PostgreSQL database tables initialized successfully")
+        if admin_created:
+            logger.info(f"Default admin user created: {ADMIN_LOGIN_HINT}")
         return True
         
     except Exception as e:
         logger.error(f"Error initializing PostgreSQL database: {e}")
-        conn.rollback()
         return False
-    finally:
-        cur.close()
-        return_db_connection(conn)
 
 def init_json_files():
     """Initialize JSON files with default admin user"""
     try:
-        users = load_json_file(USERS_FILE, [])
-        if not users:
-            admin_password = bcrypt.hashpw("admin123".encode("utf-8"), bcrypt.gensalt())
-            default_admin = {
-                "usuario": "admin",
-                "senha": admin_password.decode("utf-8"),
-                "tipo": "administrador",
-                "created_at": datetime.now().isoformat()
-            }
-            save_json_file(USERS_FILE, [default_admin])
-            logger.info("Default admin user created in JSON: admin/admin123")
+        # Workers start together; the lock lets only the first one seed the admin
+        with json_file_lock(USERS_FILE):
+            if not load_json_file(USERS_FILE, []):
+                default_admin = {
+                    "usuario": "admin",
+                    "senha": ADMIN_BCRYPT_HASH,
+                    "tipo": "administrador",
+                    "created_at": datetime.now().isoformat()
+                }
+                save_json_file(USERS_FILE, [default_admin])
+                logger.info(f"Default admin user created in JSON: {ADMIN_LOGIN_HINT}")
         
-        # Initialize other files
-        load_json_file(DOCUMENTS_FILE, [])
-        load_json_file(LOGS_FILE, [])
-        load_json_file(EXPORTS_FILE, [])
+        # Create the other files if missing; they are parsed on first use
+        for filepath in (DOCUMENTS_FILE, LOGS_FILE, EXPORTS_FILE):
+            if not filepath.exists():
+                filepath.write_bytes(b"[]")
         
         logger.info("JSON files initialized successfully")
         return True
@@ -246,58 +616,182 @@ def init_json_files():
 
 def is_valid_file(filename):
     """Check if file has valid extension"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    name = filename.lower()
+    # Like splitext, a bare dotfile such as ".png" has no extension
+    return name.endswith(ALLOWED_SUFFIXES) and "." in name.lstrip(".")
 
 def log_action(user, action, details=""):
-    """Log user actions"""
+    """Log user actions; entries are written in batches by a background thread"""
+    now = time.time_ns()
+    timestamp = datetime.fromtimestamp(now / 1e9)
+    new_log = {
+        # Unique across threads and workers even within the same nanosecond
+        "id": f"{now}_{os.getpid()}_{next(_log_ids)}",
+        "usuario": user,
+        "acao": action,
+        "detalhes": details,
+        "timestamp": timestamp
+    }
+    
+    if not POSTGRES_AVAILABLE:
+        # PostgreSQL keeps microseconds; JSON logs store the string the frontend expects
+        new_log["timestamp"] = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    
+    start_log_writer()
+    try:
+        _log_queue.put_nowait(new_log)
+        logger.info(f"Action queued for logging: {user} - {action}")
+    except queue.Full:
+        logger.error(f"Log queue full, dropping action: {user} - {action}")
+
+def write_log_entries(entries):
+    """Write a batch of queued log entries to storage"""
     if POSTGRES_AVAILABLE:
-        log_action_postgres(user, action, details)
+        write_log_entries_postgres(entries)
     else:
-        log_action_json(user, action, details)
+        write_log_entries_json(entries)
 
-def log_action_postgres(user, action, details=""):
-    """Log user actions to PostgreSQL"""
-    conn = get_db_connection()
-    if not conn:
-        return
-    
+def write_log_entries_postgres(entries):
+    """Insert a batch of log entries into PostgreSQL with one statement"""
     try:
-        cur = conn.cursor()
-        log_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
-        cur.execute("""
-            INSERT INTO logs (id, usuario, acao, detalhes) 
-            VALUES (%s, %s, %s, %s)
-        """, (log_id, user, action, details))
-        conn.commit()
-        logger.info(f"Action logged to PostgreSQL: {user} - {action}")
+        with db_cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO logs (id, usuario, acao, detalhes, timestamp) 
+                VALUES %s
+            """, [(e["id"], e["usuario"], e["acao"], e["detalhes"], e["timestamp"]) for e in entries])
+        _response_cache.pop("logs", None)
     except Exception as e:
-        logger.error(f"Error logging action to PostgreSQL: {e}")
-        conn.rollback()
-    finally:
-        cur.close()
-        return_db_connection(conn)
+        logger.error(f"Error logging actions to PostgreSQL: {e}")
 
-def log_action_json(user, action, details=""):
-    """Log user actions to JSON file"""
-    try:
-        logs = load_json_file(LOGS_FILE, [])
-        new_log = {
-            "id": datetime.now().strftime("%Y%m%d%H%M%S%f"),
-            "usuario": user,
-            "acao": action,
-            "detalhes": details,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        logs.append(new_log)
-        
-        # Keep only last 1000 logs
-        if len(logs) > 1000:
-            logs = logs[-1000:]
-        
-        save_json_file(LOGS_FILE, logs)
-        logger.info(f"Action logged to JSON: {user} - {action}")
-    except Exception as e:
-        logger.error(f"Error logging action to JSON: {e}")
+def write_log_entries_json(entries):
+    """Append a batch of log entries to the journal in a single write"""
+    global _logs_journal_size, _logs_journal_bytes
+    
+    with _logs_lock, json_file_lock(LOGS_FILE):
+        try:
+            with open(LOGS_JOURNAL_FILE, "ab") as f:
+                # Recount when another worker appended or compacted since our last write
+                if f.tell() != _logs_journal_bytes:
+                    _logs_journal_size = LOGS_JOURNAL_FILE.read_bytes().count(b"\n")
+                f.write(b"".join(encode_json(entry) + b"\n" for entry in entries))
+                _logs_journal_bytes = f.tell()
+            _logs_journal_size += len(entries)
+            
+            # The cached logs may predate these entries; reread them on next use
+            _json_cache.pop(LOGS_JOURNAL_FILE, None)
+            _response_cache.pop(LOGS_FILE, None)
+            
+            if _logs_journal_size >= LOGS_COMPACT_EVERY:
+                compact_logs_json()
+        except IOError as e:
+            logger.error(f"Error writing {LOGS_JOURNAL_FILE}: {e}")
+
+def drain_log_queue(entries):
+    """Collect every queued log entry into entries"""
+    while True:
+        try:
+            entries.append(_log_queue.get_nowait())
+        except queue.Empty:
+            return entries
+
+def flush_logs():
+    """Write all queued log entries to the journal"""
+    entries = drain_log_queue([])
+    if entries:
+        write_log_entries(entries)
+
+def log_writer():
+    """Background loop batching queued log entries into journal writes"""
+    while True:
+        entries = [_log_queue.get()]
+        write_log_entries(drain_log_queue(entries))
+        time.sleep(LOGS_FLUSH_INTERVAL)
+
+def start_log_writer():
+    """Start the log writer thread in the current process if needed"""
+    global _log_writer_thread
+    
+    if _log_writer_thread is not None and _log_writer_thread.is_alive():
+        return
+    
+    with _log_writer_lock:
+        if _log_writer_thread is None or not _log_writer_thread.is_alive():
+            _log_writer_thread = threading.Thread(target=log_writer, name="log-writer", daemon=True)
+            _log_writer_thread.start()
+
+atexit.register(flush_logs)
+
+def prune_failed_logins(now):
+    """Drop IPs whose latest failure left the window (caller holds the lock)"""
+    # Ordered by latest failure, so stop at the first IP still inside the window
+    while _failed_logins:
+        ip, failures = next(iter(_failed_logins.items()))
+        if failures[-1] > now - LOGIN_FAILURE_WINDOW:
+            break
+        del _failed_logins[ip]
+
+def login_client_ip():
+    """Address login failures are counted against, warning once if it is likely a proxy"""
+    global _proxy_warning_logged
+    if not TRUSTED_PROXY_HOPS and "X-Forwarded-For" in request.headers and not _proxy_warning_logged:
+        _proxy_warning_logged = True
+        logger.warning("Login request forwarded by a proxy but TRUSTED_PROXY_HOPS is 0; "
+                       "all clients behind it share one login failure limit")
+    return request.remote_addr
+
+def login_failed(username, details, limited):
+    """Answer a failed login; rate-limited clients get 429 and are no longer logged"""
+    if limited:
+        return jsonify({"status": "erro", "mensagem": "Muitas tentativas de login. Tente novamente em instantes"}), 429
+    log_action(username or "desconhecido", "LOGIN_FALHOU", details)
+    return jsonify({"status": "erro", "mensagem": "Credenciais inválidas"}), 401
+
+def login_rate_limited(ip):
+    """Whether ip has reached LOGIN_MAX_FAILURES within the window"""
+    now = time.monotonic()
+    with _failed_logins_lock:
+        prune_failed_logins(now)
+        failures = _failed_logins.get(ip, ())
+        return len(failures) >= LOGIN_MAX_FAILURES and failures[0] > now - LOGIN_FAILURE_WINDOW
+
+def record_failed_login(ip):
+    """Remember a failed login from ip, evicting the stalest IP past LOGIN_TRACKED_IPS"""
+    now = time.monotonic()
+    with _failed_logins_lock:
+        prune_failed_logins(now)
+        failures = _failed_logins.pop(ip, None) or deque(maxlen=LOGIN_MAX_FAILURES)
+        failures.append(now)
+        _failed_logins[ip] = failures
+        if len(_failed_logins) > LOGIN_TRACKED_IPS:
+            _failed_logins.popitem(last=False)
+
+def run_off_loop(func, *args):
+    """Run CPU-bound func in gevent's thread pool when gevent patched the process"""
+    # wsgi.py only imports gevent when running gevent workers
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return sys.modules["gevent"].get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+def check_password(password, stored_hash):
+    """bcrypt.checkpw, remembering successful checks for PASSWORD_CACHE_TTL seconds"""
+    # Keyed on the stored hash, so a password change never reuses an entry
+    key = (stored_hash, hashlib.sha256(password).digest())
+    now = time.monotonic()
+    with _password_checks_lock:
+        expires = _password_checks.pop(key, 0)
+        if expires > now:
+            _password_checks[key] = expires
+            return True
+    
+    if not run_off_loop(bcrypt.checkpw, password, stored_hash):
+        return False
+    
+    with _password_checks_lock:
+        _password_checks[key] = now + PASSWORD_CACHE_TTL
+        if len(_password_checks) > PASSWORD_CACHE_SIZE:
+            _password_checks.popitem(last=False)
+    return True
 
 def can_modify(user_type):
     """Check if user can modify data"""
@@ -307,7 +801,7 @@ def can_modify(user_type):
 @app.route("/", methods=["GET"])
 def home():
     """API documentation endpoint"""
-    storage_type = "PostgreSQL" if POSTGRES_AVAILABLE and db_pool else "JSON Files"
+    storage_type = "PostgreSQL" if POSTGRES_AVAILABLE else "JSON Files"
     return jsonify({
         "name": "Sistema de Arquivologia API",
         "version": "3.1.0",
@@ -325,7 +819,7 @@ def home():
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
-    storage_status = "PostgreSQL connected" if (POSTGRES_AVAILABLE and db_pool) else "JSON files"
+    storage_status = "PostgreSQL connected" if (POSTGRES_AVAILABLE and (db_pool or init_db_pool())) else "JSON files"
     return jsonify({
         "status": "healthy",
         "storage": storage_status,
@@ -344,55 +838,66 @@ def login():
     if not data or not data.get("usuario") or not data.get("senha"):
         return jsonify({"status": "erro", "mensagem": "Usuário e senha são obrigatórios"}), 400
     
+    # Past the failure limit valid credentials still log in; failures get 429 unlogged
+    client_ip = login_client_ip()
+    limited = login_rate_limited(client_ip)
+    
     if POSTGRES_AVAILABLE:
-        return login_postgres(data)
+        result = login_postgres(data, limited)
     else:
-        return login_json(data)
+        result = login_json(data, limited)
+    
+    if isinstance(result, tuple) and result[1] in (401, 429):
+        record_failed_login(client_ip)
+    return result
 
-def login_postgres(data):
+def login_postgres(data, limited=False):
     """Login using PostgreSQL"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({"status": "erro", "mensagem": "Erro de conexão com banco"}), 500
-    
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT senha, tipo FROM users WHERE usuario = %s", (data.get("usuario"),))
-        user = cur.fetchone()
+        with db_cursor() as cur:
+            execute_prepared(cur, "login_user", (data.get("usuario"),))
+            user = cur.fetchone()
+        
+        password = data.get("senha", "").encode('utf-8')
+        # Always run one checkpw so unknown users take as long as wrong passwords
+        if user is not None:
+            password_ok = check_password(password, user['senha'].encode('utf-8'))
+        else:
+            run_off_loop(bcrypt.checkpw, password, DUMMY_BCRYPT_HASH)
+            password_ok = False
         
-        if user and bcrypt.checkpw(data.get("senha").encode('utf-8'), user['senha'].encode('utf-8')):
+        if password_ok:
             log_action(data.get("usuario"), "LOGIN", "Login realizado com sucesso")
             return jsonify({"status": "ok", "tipo": user['tipo']})
         else:
-            log_action(data.get("usuario", "desconhecido"), "LOGIN_FALHOU", "Credenciais inválidas")
-            return jsonify({"status": "erro", "mensagem": "Credenciais inválidas"}), 401
+            return login_failed(data.get("usuario"), "Credenciais inválidas", limited)
             
+    except psycopg2.OperationalError as e:
+        logger.error(f"Database unavailable in PostgreSQL login: {e}")
+        return jsonify({"status": "erro", "mensagem": "Erro de conexão com banco"}), 500
     except Exception as e:
         logger.error(f"Error in PostgreSQL login: {e}")
         return jsonify({"status": "erro", "mensagem": "Erro interno"}), 500
-    finally:
-        cur.close()
-        return_db_connection(conn)
 
-def login_json(data):
+def login_json(data, limited=False):
     """Login using JSON files"""
     try:
-        users = load_json_file(USERS_FILE, [])
         username = data.get("usuario")
         password = data.get("senha", "").encode('utf-8')
+        user = load_json_index(USERS_FILE, "usuario").get(username)
+        
+        # Always run one checkpw so unknown users take as long as wrong passwords
+        if user is not None:
+            password_ok = check_password(password, user["senha"].encode('utf-8'))
+        else:
+            run_off_loop(bcrypt.checkpw, password, DUMMY_BCRYPT_HASH)
+            password_ok = False
         
-        for user in users:
-            if user["usuario"] == username:
-                stored_password = user["senha"].encode('utf-8')
-                if bcrypt.checkpw(password, stored_password):
-                    log_action(username, "LOGIN", "Login realizado com sucesso")
-                    return jsonify({"status": "ok", "tipo": user["tipo"]})
-                else:
-                    log_action(username, "LOGIN_FALHOU", "Senha incorreta")
-                    return jsonify({"status": "erro", "mensagem": "Credenciais inválidas"}), 401
+        if password_ok:
+            log_action(username, "LOGIN", "Login realizado com sucesso")
+            return jsonify({"status": "ok", "tipo": user["tipo"]})
         
-        log_action(username or "desconhecido", "LOGIN_FALHOU", "Usuário não encontrado")
-        return jsonify({"status": "erro", "mensagem": "Credenciais inválidas"}), 401
+        return login_failed(username, "Usuário não encontrado" if user is None else "Senha incorreta", limited)
         
     except Exception as e:
         logger.error(f"Error in JSON login: {e}")
@@ -412,51 +917,41 @@ def register_user():
 
 def register_user_postgres(data):
     """Register user using PostgreSQL"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({"status": "erro", "mensagem": "Erro de conexão com banco"}), 500
-    
     try:
-        cur = conn.cursor()
+        # Hash password and insert user unless it already exists
+        password_hash = run_off_loop(bcrypt.hashpw, data.get("senha").encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_COST, prefix=BCRYPT_PREFIX))
+        with db_cursor() as cur:
+            execute_prepared(cur, "insert_user",
+                             (data.get("usuario"), password_hash.decode("utf-8"), data.get("tipo")))
+            created = cur.fetchone() is not None
         
-        # Check if user exists
-        cur.execute("SELECT COUNT(*) FROM users WHERE usuario = %s", (data.get("usuario"),))
-        if cur.fetchone()['count'] > 0:
+        if not created:
             return jsonify({"status": "erro", "mensagem": "Usuário já existe"}), 409
         
-        # Hash password and insert user
-        password_hash = bcrypt.hashpw(data.get("senha").encode("utf-8"), bcrypt.gensalt())
-        cur.execute("""
-            INSERT INTO users (usuario, senha, tipo) 
-            VALUES (%s, %s, %s)
-        """, (data.get("usuario"), password_hash.decode("utf-8"), data.get("tipo")))
-        
-        conn.commit()
+        _response_cache.pop("users", None)
         log_action(data.get("usuario_admin", "system"), "CADASTRAR_USUARIO", 
                   f"Usuário {data.get('usuario')} cadastrado como {data.get('tipo')}")
         
         return jsonify({"status": "ok", "mensagem": "Usuário cadastrado com sucesso"})
         
+    except psycopg2.OperationalError as e:
+        logger.error(f"Database unavailable registering user in PostgreSQL: {e}")
+        return jsonify({"status": "erro", "mensagem": "Erro de conexão com banco"}), 500
     except Exception as e:
         logger.error(f"Error registering user in PostgreSQL: {e}")
-        conn.rollback()
         return jsonify({"status": "erro", "mensagem": "Erro ao cadastrar usuário"}), 500
-    finally:
-        cur.close()
-        return_db_connection(conn)
 
 def register_user_json(data):
     """Register user using JSON files"""
     try:
-        users = load_json_file(USERS_FILE, [])
         username = data.get("usuario")
         
         # Check if user already exists
-        if any(u["usuario"] == username for u in users):
+        if username in load_json_index(USERS_FILE, "usuario"):
             return jsonify({"status": "erro", "mensagem": "Usuário já existe"}), 409
         
-        # Hash password
-        password_hash = bcrypt.hashpw(data.get("senha", "").encode("utf-8"), bcrypt.gensalt())
+        # Hash password before locking, bcrypt is the slow part
+        password_hash = run_off_loop(bcrypt.hashpw, data.get("senha", "").encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_COST, prefix=BCRYPT_PREFIX))
         
         new_user = {
             "usuario": username,
@@ -465,9 +960,13 @@ def register_user_json(data):
             "created_at": datetime.now().isoformat()
         }
         
-        users.append(new_user)
+        # Re-read under the lock so concurrent registrations are not lost
+        with json_file_lock(USERS_FILE):
+            if username in load_json_index(USERS_FILE, "usuario"):
+                return jsonify({"status": "erro", "mensagem": "Usuário já existe"}), 409
+            saved = save_json_file(USERS_FILE, load_json_file(USERS_FILE, []) + [new_user])
         
-        if save_json_file(USERS_FILE, users):
+        if saved:
             log_action(data.get("usuario_admin", "system"), "CADASTRAR_USUARIO", 
                       f"Usuário {username} cadastrado como {data.get('tipo')}")
             return jsonify({"status": "ok", "mensagem": "Usuário cadastrado com sucesso"})
@@ -488,29 +987,26 @@ def list_users():
 
 def list_users_postgres():
     """List users from PostgreSQL"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify([])
+    def query():
+        with db_cursor() as cur:
+            cur.execute("SELECT usuario, tipo, created_at FROM users ORDER BY created_at")
+            return [dict(user) for user in cur.fetchall()]
     
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT usuario, tipo, created_at FROM users ORDER BY created_at")
-        users = cur.fetchall()
-        return jsonify([dict(user) for user in users])
+        return ttl_json_response("users", query)
     except Exception as e:
         logger.error(f"Error listing users from PostgreSQL: {e}")
         return jsonify([])
-    finally:
-        cur.close()
-        return_db_connection(conn)
 
 def list_users_json():
     """List users from JSON files"""
     try:
-        users = load_json_file(USERS_FILE, [])
         # Remove password hashes from response
-        safe_users = [{k: v for k, v in user.items() if k != "senha"} for user in users]
-        return jsonify(safe_users)
+        return cached_json_response(
+            USERS_FILE,
+            lambda: load_json_file(USERS_FILE, []),
+            lambda users: [{k: v for k, v in user.items() if k != "senha"} for user in users]
+        )
     except Exception as e:
         logger.error(f"Error listing users from JSON: {e}")
         return jsonify([])
@@ -524,27 +1020,51 @@ def view_data():
         return view_data_json()
 
 def view_data_postgres():
-    """View documents from PostgreSQL"""
+    """Stream documents from PostgreSQL through a server-side cursor"""
     conn = get_db_connection()
     if not conn:
         return jsonify([])
     
     try:
-        cur = conn.cursor()
+        cur = conn.cursor(name="documents_stream")
         cur.execute("SELECT data FROM documents ORDER BY created_at")
-        documents = cur.fetchall()
-        return jsonify([doc['data'] for doc in documents])
     except Exception as e:
         logger.error(f"Error listing documents from PostgreSQL: {e}")
-        return jsonify([])
-    finally:
-        cur.close()
+        conn.rollback()
         return_db_connection(conn)
+        return jsonify([])
+    
+    def generate():
+        try:
+            yield b"["
+            rows = cur.fetchmany(STREAM_BATCH_SIZE)
+            separator = b""
+            while rows:
+                yield separator + b",".join(encode_json(doc['data']) for doc in rows)
+                separator = b","
+                rows = cur.fetchmany(STREAM_BATCH_SIZE)
+            yield b"]"
+        except Exception as e:
+            logger.error(f"Error streaming documents from PostgreSQL: {e}")
+            raise
+    
+    def close():
+        try:
+            cur.close()
+            conn.rollback()
+        except Exception as e:
+            logger.error(f"Error closing documents stream: {e}")
+        finally:
+            return_db_connection(conn)
+    
+    response = app.response_class(generate(), mimetype="application/json")
+    response.call_on_close(close)
+    return response
 
 def view_data_json():
     """View documents from JSON files"""
     try:
-        return jsonify(load_json_file(DOCUMENTS_FILE, []))
+        return cached_json_response(DOCUMENTS_FILE, lambda: load_json_file(DOCUMENTS_FILE, []))
     except Exception as e:
         logger.error(f"Error listing documents from JSON: {e}")
         return jsonify([])
@@ -564,26 +1084,21 @@ def view_logs():
 
 def view_logs_postgres():
     """View logs from PostgreSQL"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify([])
+    def query():
+        with db_cursor() as cur:
+            cur.execute("SELECT * FROM logs ORDER BY timestamp DESC LIMIT 100")
+            return [dict(log) for log in cur.fetchall()]
     
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM logs ORDER BY timestamp DESC LIMIT 100")
-        logs = cur.fetchall()
-        return jsonify([dict(log) for log in logs])
+        return ttl_json_response("logs", query)
     except Exception as e:
         logger.error(f"Error listing logs from PostgreSQL: {e}")
         return jsonify([])
-    finally:
-        cur.close()
-        return_db_connection(conn)
 
 def view_logs_json():
     """View logs from JSON files"""
     try:
-        return jsonify(load_json_file(LOGS_FILE, []))
+        return cached_json_response(LOGS_FILE, load_logs_json)
     except Exception as e:
         logger.error(f"Error listing logs from JSON: {e}")
         return jsonify([])
@@ -603,6 +1118,7 @@ def internal_error(e):
     return jsonify({"status": "erro", "mensagem": "Erro interno do servidor"}), 500
 
 if __name__ == "__main__":
+    # Development server only; production runs gunicorn wsgi:app (see gunicorn.conf.py)
     # Initialize database or JSON files
     if init_database():
         logger.info("Storage initialized successfully")
@@ -613,4 +1129,4 @@ if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV') == 'development'
     
-    app.run(host='0.0.0.0', port=port, debug=debug_mode)
+    app.run(host='0.0.0.0', port=port, debug=debug_mode, threaded=True)
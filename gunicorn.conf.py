@@ -0,0 +1,39 @@
+"""Gunicorn configuration for production: gunicorn wsgi:app"""
+import os
+
+wsgi_app = "wsgi:app"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# JSON storage is cached per process, so keep a single worker by default
+# and scale with threads (gthread) or greenlets (gevent)
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = 60
+
+# Import the app once in the master and fork workers from it; the database
+# pool is created lazily, so no connections are shared across the fork
+preload_app = True
+
+def post_fork(server, worker):
+    """Make psycopg2 cooperative when running gevent workers"""
+    # Read the effective class, so -k gevent counts as well as the env var
+    if "gevent" in server.cfg.worker_class_str:
+        if os.environ.get("GUNICORN_WORKER_CLASS") != "gevent":
+            server.log.warning("gevent workers started without GUNICORN_WORKER_CLASS=gevent; "
+                               "the preloaded app was not patched (see wsgi.py)")
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen not available; PostgreSQL calls will block the worker")
+
+def post_worker_init(worker):
+    """Initialize database or JSON files once the worker has loaded the app"""
+    from app import init_database, logger
+
+    if init_database():
+        logger.info("Storage initialized successfully")
+    else:
+        logger.error("Failed to initialize storage")
@@ -0,0 +1,209 @@
+"""Regression tests for app.py, run with: python -m unittest discover tests"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("BCRYPT_COST", "4")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+
+class JSONStorageTestCase(unittest.TestCase):
+    """Point the JSON storage at a temporary directory with empty caches"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        data_dir = Path(tmp.name)
+        for name, filename in [
+            ("USERS_FILE", "usuarios.json"),
+            ("DOCUMENTS_FILE", "dados.json"),
+            ("LOGS_FILE", "logs.json"),
+            ("EXPORTS_FILE", "exportacoes.json"),
+            ("LOGS_JOURNAL_FILE", "logs.jsonl"),
+        ]:
+            patcher = mock.patch.object(app, name, data_dir / filename)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Tests flush the log queue themselves instead of the writer thread
+        patcher = mock.patch.object(app, "start_log_writer", lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for cache in (app._json_cache, app._json_indexes, app._response_cache):
+            cache.clear()
+        app._logs_journal_size = 0
+        app._logs_journal_bytes = None
+        app.drain_log_queue([])
+        # Leave nothing queued for the atexit flush into the real data directory
+        self.addCleanup(app.drain_log_queue, [])
+        self.assertTrue(app.init_json_files())
+        self.client = app.app.test_client()
+
+    def disk_log_ids(self):
+        with app._logs_lock:
+            return [log["id"] for log in app.read_logs_from_disk()]
+
+    def cached_log_ids(self):
+        return [log["id"] for log in app.load_logs_json()]
+
+
+class LogCacheTests(JSONStorageTestCase):
+
+    def test_entry_written_after_reread_is_not_lost(self):
+        app.write_log_entries_json([{"id": "warm0"}, {"id": "warm1"}])
+        app.load_logs_json()
+
+        app.log_action("u", "A", "e1")
+        app.flush_logs()
+        app.log_action("u", "A", "e2")
+
+        # Another worker appends, so the next read goes back to disk
+        with open(app.LOGS_JOURNAL_FILE, "ab") as f:
+            f.write(b'{"id": "e3"}\n')
+        app.load_logs_json()
+
+        app.flush_logs()
+        self.assertEqual(self.cached_log_ids(), self.disk_log_ids())
+        self.assertEqual(len(self.client.get("/ver_logs").get_json()), 5)
+
+    def test_cached_logs_only_hold_written_entries(self):
+        app.load_logs_json()
+        app.log_action("u", "A", "queued")
+        self.assertEqual(self.cached_log_ids(), [])
+
+        app.flush_logs()
+        self.assertEqual(self.cached_log_ids(), self.disk_log_ids())
+        self.assertEqual(len(self.cached_log_ids()), 1)
+
+
+
+class LoginTests(JSONStorageTestCase):
+
+    def login(self, password, username="admin"):
+        return self.client.post("/login", json={"usuario": username, "senha": password})
+
+    def test_rate_limited_client_can_still_log_in(self):
+        app._failed_logins.clear()
+        self.addCleanup(app._failed_logins.clear)
+        for _ in range(app.LOGIN_MAX_FAILURES):
+            self.assertEqual(self.login("wrong").status_code, 401)
+        app.flush_logs()
+        logged = len(self.disk_log_ids())
+
+        self.assertEqual(self.login("wrong").status_code, 429)
+        self.assertEqual(self.login("x", username="nobody").status_code, 429)
+        self.assertEqual(self.login("admin123").status_code, 200)
+        app.flush_logs()
+        # Only the successful login is logged past the limit
+        self.assertEqual(len(self.disk_log_ids()), logged + 1)
+
+    def test_unknown_user_checks_the_precomputed_dummy_hash(self):
+        with mock.patch.object(app.bcrypt, "hashpw") as hashpw, \
+                mock.patch.object(app.bcrypt, "checkpw", return_value=False) as checkpw:
+            self.assertEqual(self.login("x", username="nobody").status_code, 401)
+        hashpw.assert_not_called()
+        checkpw.assert_called_once_with(b"x", app.DUMMY_BCRYPT_HASH)
+
+    def test_dummy_hash_matches_the_admin_cost(self):
+        self.assertEqual(app.DUMMY_BCRYPT_HASH[:7], app.ADMIN_BCRYPT_HASH.encode("utf-8")[:7])
+
+
+class FileLockFallbackTests(JSONStorageTestCase):
+
+    def test_fallback_reuses_one_lock_per_file(self):
+        with mock.patch.object(app, "FCNTL_AVAILABLE", False):
+            app.save_json_file(app.DOCUMENTS_FILE, [{"id": "1"}])
+            lock = app._file_lock_fallbacks[app.DOCUMENTS_FILE]
+            with mock.patch.object(app.threading, "Lock") as new_lock:
+                app.save_json_file(app.DOCUMENTS_FILE, [{"id": "2"}])
+            new_lock.assert_not_called()
+            self.assertIs(app._file_lock_fallbacks[app.DOCUMENTS_FILE], lock)
+        self.assertEqual(app.load_json_file(app.DOCUMENTS_FILE, []), [{"id": "2"}])
+
+
+class CompressionTests(JSONStorageTestCase):
+
+    def setUp(self):
+        super().setUp()
+        users = app.load_json_file(app.USERS_FILE, [])
+        app.save_json_file(app.USERS_FILE, users + [
+            {"usuario": f"user{i}", "senha": "x", "tipo": "editor"} for i in range(40)
+        ])
+
+    def encoding(self, accept_encoding):
+        response = self.client.get("/ver_usuarios", headers={"Accept-Encoding": accept_encoding})
+        return response.headers.get("Content-Encoding")
+
+    def test_cached_listing_honours_quality_values(self):
+        self.assertEqual(self.encoding("gzip;q=1, br;q=0.1"), "gzip")
+        self.assertEqual(self.encoding("gzip;q=0.5, br"), "br")
+        self.assertEqual(self.encoding("br;q=0, gzip"), "gzip")
+        self.assertIsNone(self.encoding("identity"))
+
+    def test_cached_listing_matches_flask_compress(self):
+        big = [{"k": i} for i in range(200)]
+        with mock.patch.object(app, "load_json_file", return_value=big):
+            for accept_encoding in ("gzip;q=1, br;q=0.1", "br, gzip", "gzip", "deflate, *"):
+                headers = {"Accept-Encoding": accept_encoding}
+                with app.app.test_request_context(headers=headers):
+                    expected = app.app.process_response(app.jsonify(big)).headers.get("Content-Encoding")
+                cached = self.client.get("/ver_dados", headers=headers)
+                self.assertEqual(cached.headers.get("Content-Encoding"), expected, accept_encoding)
+
+
+class UploadValidationTests(unittest.TestCase):
+
+    def test_allowed_extensions(self):
+        for filename in ("a.png", "A.PNG", "b.docx", "c.doc", ".a.png", "clip.final.mp4"):
+            self.assertTrue(app.is_valid_file(filename), filename)
+
+    def test_rejected_names(self):
+        # Bare dotfiles have no extension, matching os.path.splitext
+        for filename in (".png", "..png", "png", "a.exe", "a.png.exe", "a"):
+            self.assertFalse(app.is_valid_file(filename), filename)
+
+    def test_matches_splitext(self):
+        for filename in ("a.png", ".png", "..png", ".a.png", "x.PDF", "x.", "...", "a..txt"):
+            ext = os.path.splitext(filename)[1][1:].lower()
+            self.assertEqual(app.is_valid_file(filename), ext in app.ALLOWED_EXTENSIONS, filename)
+
+
+class LoginRateLimitTests(unittest.TestCase):
+
+    def setUp(self):
+        app._failed_logins.clear()
+        self.addCleanup(app._failed_logins.clear)
+
+    def test_limits_after_max_failures(self):
+        for _ in range(app.LOGIN_MAX_FAILURES - 1):
+            app.record_failed_login("10.0.0.1")
+        self.assertFalse(app.login_rate_limited("10.0.0.1"))
+        app.record_failed_login("10.0.0.1")
+        self.assertTrue(app.login_rate_limited("10.0.0.1"))
+        self.assertFalse(app.login_rate_limited("10.0.0.2"))
+
+    def test_tracked_ips_are_capped(self):
+        for i in range(app.LOGIN_TRACKED_IPS * 3):
+            app.record_failed_login(f"ip{i}")
+        self.assertEqual(len(app._failed_logins), app.LOGIN_TRACKED_IPS)
+        self.assertNotIn("ip0", app._failed_logins)
+        self.assertIn(f"ip{app.LOGIN_TRACKED_IPS * 3 - 1}", app._failed_logins)
+
+    def test_failures_expire(self):
+        app.record_failed_login("10.0.0.1")
+        later = time.monotonic() + app.LOGIN_FAILURE_WINDOW + 1
+        with mock.patch.object(app.time, "monotonic", return_value=later):
+            self.assertFalse(app.login_rate_limited("10.0.0.1"))
+        self.assertNotIn("10.0.0.1", app._failed_logins)
+
+
+if __name__ == "__main__":
+    unittest.main()
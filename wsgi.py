@@ -0,0 +1,11 @@
+"""WSGI entry point for gunicorn: gunicorn wsgi:app"""
+import os
+
+# gevent must patch the stdlib before app creates its locks, queues and threads.
+# The app is preloaded before gunicorn reads -k, so gevent is enabled by setting
+# GUNICORN_WORKER_CLASS=gevent (which gunicorn.conf.py also uses), not by -k alone
+if os.environ.get("GUNICORN_WORKER_CLASS") == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import app